@@ -0,0 +1,11 @@
+"""
+Settings overrides for running the test suite.
+
+Run with: python manage.py test --settings=app.test_settings
+"""
+from app.settings import *  # noqa: F401,F403
+
+# The suite creates users constantly and doesn't need real password
+# security; MD5 turns each hash from tens of milliseconds into
+# microseconds, which dominates test wall time.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
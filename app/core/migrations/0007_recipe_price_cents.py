@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def copy_price_to_cents(apps, schema_editor):
+    Recipe = apps.get_model('core', 'Recipe')
+    for recipe in Recipe.objects.all().iterator():
+        recipe.price_cents = int(recipe.price * 100)
+        recipe.save(update_fields=['price_cents'])
+
+
+def copy_cents_to_price(apps, schema_editor):
+    Recipe = apps.get_model('core', 'Recipe')
+    for recipe in Recipe.objects.all().iterator():
+        recipe.price = recipe.price_cents / 100
+        recipe.save(update_fields=['price'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_auto_20260901_0435'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='price_cents',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_price_to_cents, copy_cents_to_price),
+        migrations.RemoveField(
+            model_name='recipe',
+            name='price',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-09-01 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_recipe_price_cents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
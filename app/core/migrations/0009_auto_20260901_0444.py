@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-09-01 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_recipe_date_modified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-id'], name='core_recipe_user_id_98373e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-date_added'], name='core_recipe_user_id_2e36eb_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-09-01 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_auto_20260901_0444'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', '-name'], name='core_ingred_user_id_344ab4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-name'], name='core_tag_user_id_0e0962_idx'),
+        ),
+    ]
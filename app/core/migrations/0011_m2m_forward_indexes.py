@@ -0,0 +1,33 @@
+# Hand-written: forward composite indexes on the recipe M2M through
+# tables. Django's auto-created through models only index the
+# (recipe, attr) direction via unique_together; filtering recipes by
+# tag/ingredient ids probes the (attr, recipe) direction, which these
+# indexes serve without touching the table.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_auto_20260901_0449'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX core_recipe_tags_tag_recipe_idx '
+                'ON core_recipe_tags (tag_id, recipe_id);'
+            ),
+            reverse_sql='DROP INDEX core_recipe_tags_tag_recipe_idx;',
+        ),
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX core_recipe_ingredients_ingredient_recipe_idx '
+                'ON core_recipe_ingredients (ingredient_id, recipe_id);'
+            ),
+            reverse_sql=(
+                'DROP INDEX core_recipe_ingredients_ingredient_recipe_idx;'
+            ),
+        ),
+    ]
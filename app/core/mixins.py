@@ -0,0 +1,27 @@
+"""
+Shared serializer mixins.
+"""
+import copy
+
+
+class CachedFieldsMixin:
+    """Cache the field map built by get_fields() per serializer class.
+
+    DRF rebuilds the whole field map for every serializer instance,
+    re-reading Meta and introspecting the model each time. The map
+    only depends on the class, so we build it once and hand out
+    deep copies afterwards. Copies are mandatory: binding mutates the
+    fields, and DRF fields implement __deepcopy__ by re-instantiating
+    from their original arguments, so each copy starts out unbound.
+    """
+
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = type(self)
+        fields = self._fields_cache.get(cls)
+        if fields is None:
+            fields = self._fields_cache[cls] = super().get_fields()
+        return {
+            name: copy.deepcopy(field) for name, field in fields.items()
+        }
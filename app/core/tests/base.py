@@ -0,0 +1,17 @@
+"""
+Shared base classes for API tests.
+"""
+from django.test import TestCase
+
+
+class BaseAPITestCase(TestCase):
+    """Transaction-wrapped test case for the API suites.
+
+    Keep this inheriting from TestCase: "upgrading" to
+    TransactionTestCase would flush every table after each test
+    instead of rolling back a transaction, slowing the suite by an
+    order of magnitude. Serialized rollback stays off because no test
+    depends on data loaded by migrations.
+    """
+
+    serialized_rollback = False
@@ -103,11 +103,11 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(ingredient), ingredient.name)
 
-    @patch('core.models.uuid.uuid4')
+    @patch('core.models.uuid7')
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test that image is saved in the correct location."""
-        uuid = 'test-uuid'
-        mock_uuid.return_value = uuid
+        uuid = 'testuuidhex'
+        mock_uuid.return_value.hex = uuid
         file_path = models.recipe_image_file_path(None, 'myimage.jpg')
         exp_path = f'uploads/recipe/{uuid}.jpg'
 
@@ -0,0 +1,61 @@
+"""
+List-response caching for the recipe app endpoints.
+
+Tags and ingredients are written rarely but listed often, so the
+rendered list data is kept in the cache per user and dropped whenever
+one of that user's rows (or its recipe assignment) changes — see
+recipe/signals.py.
+
+The recipe list varies by query params (filters, sparse fieldsets),
+so its entries can't be enumerated for deletion. Instead each user
+has a version counter baked into the key; bumping it orphans every
+cached variant at once and the TTL reclaims them.
+"""
+from hashlib import md5
+
+from django.core.cache import cache
+
+LIST_CACHE_TTL = 60 * 5
+
+
+def attr_list_cache_key(model_name, user_id, assigned_only):
+    """Build the cache key for one user's attr list variant."""
+    return f'recipe-attr-list:{model_name}:{user_id}:{int(assigned_only)}'
+
+
+def invalidate_attr_lists(model_name, user_id):
+    """Drop both cached list variants for the given user."""
+    cache.delete_many([
+        attr_list_cache_key(model_name, user_id, False),
+        attr_list_cache_key(model_name, user_id, True),
+    ])
+
+
+def _recipe_list_version_key(user_id):
+    return f'recipe-list-version:{user_id}'
+
+
+def recipe_list_version(user_id):
+    """Return the user's current recipe-list version counter."""
+    return cache.get(_recipe_list_version_key(user_id), 0)
+
+
+def recipe_list_cache_key(user_id, query_params):
+    """Build the cache key for one user's recipe list variant."""
+    version = recipe_list_version(user_id)
+    params = md5(
+        '&'.join(
+            f'{k}={v}' for k, v in sorted(query_params.items())
+        ).encode()
+    ).hexdigest()
+    return f'recipe-list:{user_id}:{version}:{params}'
+
+
+def invalidate_recipe_lists(user_id):
+    """Orphan every cached recipe list variant for the given user."""
+    key = _recipe_list_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No counter yet: any cached entries used version 0.
+        cache.add(key, 1, None)
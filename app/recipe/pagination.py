@@ -0,0 +1,16 @@
+"""
+Pagination classes for the recipe app.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Cursor pagination over the recipe list.
+
+    Cursor paging slices with `id < last_seen LIMIT n`, so there is
+    no COUNT(*) query and no OFFSET scan that grows with the page
+    number; each page costs the same single indexed query.
+    """
+
+    ordering = '-id'
+    page_size = 25
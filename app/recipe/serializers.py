@@ -1,10 +1,38 @@
 """
 Serializers for the Recipe app.
 """
+import io
+import os
 
+from PIL import Image
+
+from django.core.files.base import ContentFile
+from django.db import transaction
 from rest_framework import serializers
+from core.mixins import CachedFieldsMixin
 from core.models import (Recipe, Tag, Ingredient)
 
+# Uploads larger than this are downscaled before hitting storage.
+MAX_IMAGE_SIZE = 1024
+
+
+class DynamicFieldsMixin:
+    """Let callers restrict output to a subset of fields.
+
+    Pass fields=['id', 'title'] (the viewset wires this to the
+    ?fields= query param) to shrink both the serializer field map and
+    the rendered payload.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        self._sparse_fields = None
+        if fields is not None:
+            self._sparse_fields = allowed = set(fields)
+            for field_name in set(self.fields) - allowed:
+                self.fields.pop(field_name)
+
 
 class IngredientSerializer(serializers.ModelSerializer):
     """Serializer for ingredient objects."""
@@ -14,6 +42,11 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name',)
         read_only_fields = ('id',)
 
+    def to_representation(self, instance):
+        # Specialized for the two known fields; skips DRF's generic
+        # get_attribute/to_representation walk over self.fields.
+        return {'id': instance.id, 'name': instance.name}
+
 
 class TagSerializer(serializers.ModelSerializer):
     """Serializer for tag objects."""
@@ -23,11 +56,20 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ('id', 'name')
         read_only_fields = ('id',)
 
+    def to_representation(self, instance):
+        # Specialized for the two known fields; skips DRF's generic
+        # get_attribute/to_representation walk over self.fields.
+        return {'id': instance.id, 'name': instance.name}
 
-class RecipeSerializer(serializers.ModelSerializer):
+
+class RecipeSerializer(DynamicFieldsMixin, CachedFieldsMixin,
+                       serializers.ModelSerializer):
     """Serializer for recipe objects."""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
+    # Declared explicitly: price is a model property backed by the
+    # integer price_cents column.
+    price = serializers.DecimalField(max_digits=5, decimal_places=2)
 
     class Meta:
         model = Recipe
@@ -35,56 +77,116 @@ class RecipeSerializer(serializers.ModelSerializer):
                   'ingredients')
         read_only_fields = ('id',)
 
+    def to_representation(self, instance):
+        """Build the output dict directly.
+
+        Skips DRF's generic field-binding loop (and the per-tag nested
+        serializer instantiation), which dominates CPU on large lists.
+        Relies on the viewset prefetching tags/ingredients.
+        """
+        allowed = self._sparse_fields
+        data = {
+            'id': instance.id,
+            'title': instance.title,
+            'time_minutes': instance.time_minutes,
+            'price': str(instance.price),
+            'link': instance.link,
+        }
+        if allowed is not None:
+            data = {k: v for k, v in data.items() if k in allowed}
+        if allowed is None or 'tags' in allowed:
+            data['tags'] = [
+                {'id': t.id, 'name': t.name} for t in instance.tags.all()
+            ]
+        if allowed is None or 'ingredients' in allowed:
+            data['ingredients'] = [
+                {'id': i.id, 'name': i.name}
+                for i in instance.ingredients.all()
+            ]
+        return data
+
+    # atomic batches the recipe insert and the tag/ingredient writes
+    # into one commit (a single fsync on Postgres) and keeps partial
+    # writes from surviving a failed request.
+    @transaction.atomic
     def create(self, validated_data):
         """Create a recipe."""
         tags = validated_data.pop('tags', [])
         ingredients = validated_data.pop('ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
-        auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag
-            )
-            recipe.tags.add(tag_obj)
+        self._create_or_update_tags(recipe, tags)
         self._get_or_create_ingredients(recipe, ingredients)
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update a recipe with tags."""
         tags_data = validated_data.pop('tags', None)
         ingredients_data = validated_data.pop('ingredients', None)
 
         if tags_data is not None:
-            instance.tags.clear()
-            self._create_or_update_tags(instance, tags_data)
+            self._sync_m2m(instance.tags, Tag, tags_data)
 
         if ingredients_data is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(instance, ingredients_data)
+            self._sync_m2m(instance.ingredients, Ingredient,
+                           ingredients_data)
 
         return super().update(instance, validated_data)
 
+    def _sync_m2m(self, manager, model, items_data):
+        """Replace a recipe relation's contents, touching only the diff.
+
+        Skips the clear()-then-re-add round-trips; a no-op payload
+        issues no writes at all.
+        """
+        new_objs = (
+            self._bulk_get_or_create(model, items_data)
+            if items_data else []
+        )
+        new_ids = {obj.id for obj in new_objs}
+        current_ids = set(manager.values_list('id', flat=True))
+        to_remove = current_ids - new_ids
+        to_add = [obj for obj in new_objs if obj.id not in current_ids]
+        if to_remove:
+            manager.remove(*to_remove)
+        if to_add:
+            manager.add(*to_add)
+
+    def _bulk_get_or_create(self, model, items_data):
+        """Fetch or create the given tag/ingredient rows in bulk."""
+        auth_user = self.context['request'].user
+        names = [item['name'] for item in items_data]
+        existing = {
+            obj.name: obj
+            for obj in model.objects.filter(user=auth_user, name__in=names)
+        }
+        to_create = [
+            model(user=auth_user, name=name)
+            for name in names if name not in existing
+        ]
+        if to_create:
+            model.objects.bulk_create(to_create, ignore_conflicts=True)
+            # Re-query so we have primary keys for the new rows as well.
+            existing = {
+                obj.name: obj
+                for obj in model.objects.filter(
+                    user=auth_user, name__in=names
+                )
+            }
+        return [existing[name] for name in names]
+
     def _create_or_update_tags(self, recipe, tags_data):
         """Handle creating or updating tags."""
-        auth_user = self.context['request'].user
-        for tag in tags_data:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag
-            )
-            recipe.tags.add(tag_obj)
+        if tags_data:
+            recipe.tags.add(*self._bulk_get_or_create(Tag, tags_data))
 
     def _get_or_create_ingredients(self, recipe, ingredients_data):
         """Handle creating or updating ingredients."""
-        auth_user = self.context['request'].user
-        for ingredient in ingredients_data:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient
+        if ingredients_data:
+            recipe.ingredients.add(
+                *self._bulk_get_or_create(Ingredient, ingredients_data)
             )
-            recipe.ingredients.add(ingredient_obj)
         return recipe
 
 
@@ -94,8 +196,15 @@ class RecipeDetailSerializer(RecipeSerializer):
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ('description',)
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if (self._sparse_fields is None
+                or 'description' in self._sparse_fields):
+            data['description'] = instance.description
+        return data
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+
+class RecipeImageSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for uploading images to recipes."""
 
     class Meta:
@@ -103,3 +212,24 @@ class RecipeImageSerializer(serializers.ModelSerializer):
         fields = ('id', 'image')
         read_only_fields = ('id',)
         extra_kwargs = {'image': {'required': True}}
+
+    def validate_image(self, image):
+        """Downscale oversized uploads before they reach storage.
+
+        Phone-camera originals run to 10+ MB; nothing in the API
+        serves them above MAX_IMAGE_SIZE pixels. draft() asks libjpeg
+        to decode at reduced resolution, so large JPEGs never fully
+        inflate in memory, and thumbnail() finishes the resize.
+        """
+        image.seek(0)
+        img = Image.open(image)
+        if max(img.size) <= MAX_IMAGE_SIZE:
+            return image
+        img.draft('RGB', (MAX_IMAGE_SIZE, MAX_IMAGE_SIZE))
+        img.thumbnail((MAX_IMAGE_SIZE, MAX_IMAGE_SIZE), Image.LANCZOS)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        buf = io.BytesIO()
+        img.save(buf, 'JPEG', quality=85, optimize=True)
+        name = os.path.splitext(image.name)[0] + '.jpg'
+        return ContentFile(buf.getvalue(), name=name)
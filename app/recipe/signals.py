@@ -0,0 +1,42 @@
+"""
+Cache invalidation hooks for the recipe app list caches.
+
+Connected in RecipeConfig.ready(). Signals (rather than viewset
+overrides) make sure writes from the admin, shell or the recipe
+serializer's bulk paths also drop stale entries.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.caching import invalidate_attr_lists, invalidate_recipe_lists
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def _recipe_changed(sender, instance, **kwargs):
+    invalidate_recipe_lists(instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def _attr_changed(sender, instance, **kwargs):
+    invalidate_attr_lists(sender._meta.model_name, instance.user_id)
+    # Renaming or deleting an attr also changes the recipe payloads
+    # that embed its name.
+    invalidate_recipe_lists(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def _attr_assignment_changed(sender, instance, **kwargs):
+    # Assigning/unassigning changes what assigned_only=1 returns and
+    # the tag/ingredient lists embedded in the recipe payloads.
+    if isinstance(instance, Recipe):
+        model_name = (
+            'tag' if sender is Recipe.tags.through else 'ingredient'
+        )
+        invalidate_attr_lists(model_name, instance.user_id)
+        invalidate_recipe_lists(instance.user_id)
@@ -2,20 +2,25 @@
 Tests for the ingredient API
 """
 from decimal import Decimal
+from functools import lru_cache
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
 from django.urls import reverse
 
+from core.tests.base import BaseAPITestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import (Ingredient, Recipe)
 from recipe.serializers import IngredientSerializer
 
+# Resolve the user model once per module import, not per call.
+User = get_user_model()
+
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
 
 
+@lru_cache(maxsize=None)
 def detail_url(ingredient_id):
     """Create and return an ingredient detail URL."""
     return reverse('recipe:ingredient-detail', args=[ingredient_id])
@@ -23,10 +28,10 @@ def detail_url(ingredient_id):
 
 def create_user(email="user@example.com", password="testpass123"):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(email=email, password=password)
+    return User.objects.create_user(email=email, password=password)
 
 
-class PublicIngredientApiTests(TestCase):
+class PublicIngredientApiTests(BaseAPITestCase):
     """Test the publicly available ingredient API."""
 
     def setUp(self):
@@ -38,12 +43,16 @@ class PublicIngredientApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateIngredientApiTests(TestCase):
+class PrivateIngredientApiTests(BaseAPITestCase):
     """Test the private ingredient API."""
 
+    @classmethod
+    def setUpTestData(cls):
+        # Hash the password once per class instead of once per test.
+        cls.user = create_user()
+
     def setUp(self):
         self.client = APIClient()
-        self.user = create_user()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_ingredients(self):
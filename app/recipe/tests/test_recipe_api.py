@@ -2,25 +2,34 @@
 Tests for the Recipe API
 """
 from decimal import Decimal
-import tempfile
+from functools import lru_cache
+import io
 import os
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
+from core.tests.base import BaseAPITestCase
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import (APIClient, APIRequestFactory,
+                                 force_authenticate)
+from recipe.views import RecipeViewSet
 from core.models import Recipe, Tag, Ingredient
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
+# Resolve the user model once per module import, not per call.
+User = get_user_model()
+
 RECIPE_URL = reverse('recipe:recipe-list')
 
 
+@lru_cache(maxsize=None)
 def detail_url(recipe_id):
     """Create and return a recipe detail URL."""
     return reverse('recipe:recipe-detail', args=[recipe_id])
 
 
+@lru_cache(maxsize=None)
 def image_upload_url(recipe_id):
     """Create and return an image upload URL."""
     return reverse('recipe:recipe-upload-image', args=[recipe_id])
@@ -40,7 +49,7 @@ def create_recipe(user, **params):
     return Recipe.objects.create(user=user, **defaults)
 
 
-class PublicRecipeApiTests(TestCase):
+class PublicRecipeApiTests(BaseAPITestCase):
     """Test the publicly available recipe API."""
 
     def setUp(self):
@@ -52,32 +61,111 @@ class PublicRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateRecipeApiTests(TestCase):
+class PrivateRecipeApiTests(BaseAPITestCase):
     """Test the private authenticated recipe API."""
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Hash the password once per class instead of once per test.
+        cls.user = User.objects.create_user(
             'user@example.com',
             'testpass123'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
         """Test retrieving a list of recipes."""
+        recipe1 = create_recipe(user=self.user)
+        recipe2 = create_recipe(user=self.user)
+
+        res = self.client.get(RECIPE_URL)
+
+        # Compare against plain dicts instead of re-running the same
+        # serializer the view just ran.
+        expected = [
+            {
+                'id': recipe.id,
+                'title': recipe.title,
+                'time_minutes': recipe.time_minutes,
+                'price': str(recipe.price),
+                'link': recipe.link,
+                'tags': [],
+                'ingredients': [],
+            }
+            for recipe in (recipe2, recipe1)
+        ]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], expected)
+        self.assertIsNone(res.data['next'])
+
+    def test_retrieve_recipes_query_count(self):
+        """Test the list endpoint issues a constant number of queries."""
+        for i in range(5):
+            recipe = create_recipe(user=self.user)
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {i}')
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'Ing {i}')
+            )
+
+        # ETag aggregate, recipe rows, tag links, ingredient links —
+        # independent of how many recipes exist.
+        with self.assertNumQueries(4):
+            res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 5)
+
+    def test_retrieve_recipes_sparse_fields(self):
+        """Test limiting the list payload with the fields param."""
         create_recipe(user=self.user)
+
+        res = self.client.get(RECIPE_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(set(res.data['results'][0]), {'id', 'title'})
+
+    def test_retrieve_recipes_fresh_etag_returns_304(self):
+        """Test a conditional GET with a current ETag gets a 304."""
         create_recipe(user=self.user)
 
         res = self.client.get(RECIPE_URL)
+        etag = res['ETag']
 
-        recipes = Recipe.objects.all().order_by('-id')
-        serializer = RecipeSerializer(recipes, many=True)
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_tag_rename_invalidates_list_etag(self):
+        """Test renaming a tag busts client-side list caches."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        recipe.tags.add(tag)
+
+        res = self.client.get(RECIPE_URL)
+        etag = res['ETag']
+
+        # Renaming touches no Recipe row, only the tag.
+        tag.name = 'Supper'
+        tag.save()
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(
+            res.data['results'][0]['tags'][0]['name'], 'Supper')
+
+    def test_filter_with_malformed_ids_returns_400(self):
+        """Test a non-numeric filter param is rejected, not a 500."""
+        res = self.client.get(RECIPE_URL, {'tags': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_recipe_limited_to_user(self):
         """Test list of recipes is limited to authenticated user."""
-        other_user = get_user_model().objects.create_user(
+        other_user = User.objects.create_user(
             'other@example.com',
             'testpass123'
         )
@@ -87,13 +175,20 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipe_detail(self):
         """Test get recipe detail."""
         recipe = create_recipe(user=self.user)
-        url = detail_url(recipe.id)
-        res = self.client.get(url)
+
+        # This test only checks the serialized payload, so call the
+        # viewset directly via APIRequestFactory and skip the full
+        # middleware/URL-resolution stack APIClient pays for.
+        factory = APIRequestFactory()
+        request = factory.get(detail_url(recipe.id))
+        force_authenticate(request, user=self.user)
+        res = RecipeViewSet.as_view({'get': 'retrieve'})(
+            request, pk=recipe.id)
 
         serializer = RecipeDetailSerializer(recipe)
         self.assertEqual(res.data, serializer.data)
@@ -132,12 +227,11 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {tag['name'] for tag in payload['tags']}
+        found = set(recipe.tags.filter(
+            user=self.user, name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_create_recipe_with_existing_tags(self):
         """Test creating a recipe with existing tags. If the tag already exists
@@ -157,12 +251,11 @@ class PrivateRecipeApiTests(TestCase):
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
         self.assertIn(tag_1, recipe.tags.all())
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {tag['name'] for tag in payload['tags']}
+        found = set(recipe.tags.filter(
+            user=self.user, name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_create_recipe_with_invalid_tags(self):
         """Test creating a recipe with invalid tags."""
@@ -202,12 +295,11 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         new_tags = Tag.objects.filter(user=self.user)
         self.assertEqual(new_tags.count(), 2)
-        for tag in payload['tags']:
-            exists = new_tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {tag['name'] for tag in payload['tags']}
+        found = set(new_tags.filter(
+            name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_partial_update_recipe(self):
         """Test updating a recipe with patch."""
@@ -223,8 +315,10 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         recipe.refresh_from_db()
-        self.assertEqual(recipe.title, payload['title'])
-        self.assertEqual(recipe.link, original_link)
+        self.assertEqual(
+            {'title': recipe.title, 'link': recipe.link},
+            {'title': payload['title'], 'link': original_link},
+        )
 
     def test_full_update_recipe(self):
         """Test updating a recipe with put."""
@@ -245,8 +339,9 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         recipe.refresh_from_db()
-        for k, v in payload.items():
-            self.assertEqual(getattr(recipe, k), v)
+        # One dict comparison instead of an assert per attribute.
+        stored = {k: getattr(recipe, k) for k in payload}
+        self.assertEqual(stored, payload)
 
     def test_update_recipe_with_new_tags(self):
         """Test updating a recipe with new tags."""
@@ -260,12 +355,11 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         new_tags = Tag.objects.filter(user=self.user)
         self.assertEqual(new_tags.count(), 2)
-        for tag in payload['tags']:
-            exists = new_tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {tag['name'] for tag in payload['tags']}
+        found = set(new_tags.filter(
+            name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_update_recipe_with_existing_tags(self):
         """Test updating a recipe with existing tags."""
@@ -281,12 +375,11 @@ class PrivateRecipeApiTests(TestCase):
         recipe.refresh_from_db()
         self.assertEqual(recipe.tags.count(), 2)
         self.assertIn(tag_1, recipe.tags.all())
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {tag['name'] for tag in payload['tags']}
+        found = set(recipe.tags.filter(
+            user=self.user, name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_update_recipe_with_invalid_tags(self):
         """Test updating a recipe with invalid tags."""
@@ -314,12 +407,11 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 2)
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {ingredient['name'] for ingredient in payload['ingredients']}
+        found = set(recipe.ingredients.filter(
+            user=self.user, name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_create_recipe_with_existing_ingredient(self):
         """Test creating a new recipe with existing ingredient."""
@@ -338,12 +430,11 @@ class PrivateRecipeApiTests(TestCase):
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 2)
         self.assertIn(ingredient, recipe.ingredients.all())
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+        names = {ingredient['name'] for ingredient in payload['ingredients']}
+        found = set(recipe.ingredients.filter(
+            user=self.user, name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_create_recipe_with_invalid_ingredients(self):
         """Test creating a recipe with invalid ingredients."""
@@ -383,12 +474,11 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         new_ingredients = Ingredient.objects.filter(user=self.user)
         self.assertEqual(new_ingredients.count(), 2)
-        for ingredient in payload['ingredients']:
-            exists = new_ingredients.filter(
-                name=ingredient['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        names = {ingredient['name'] for ingredient in payload['ingredients']}
+        found = set(new_ingredients.filter(
+            name__in=names
+        ).values_list('name', flat=True))
+        self.assertEqual(found, names)
 
     def test_update_recipe_assigned_to_ingredient(self):
         """Test assigning an existing ingredient when updating a recipe."""
@@ -438,8 +528,11 @@ class PrivateRecipeApiTests(TestCase):
         r2 = create_recipe(user=self.user, title='Aubergine with Tahini')
         tag1 = Tag.objects.create(user=self.user, name='Vegan')
         tag2 = Tag.objects.create(user=self.user, name='Vegetarian')
-        r1.tags.add(tag1)
-        r2.tags.add(tag2)
+        # One through-table INSERT for both assignments.
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=r1, tag=tag1),
+            Recipe.tags.through(recipe=r2, tag=tag2),
+        ])
         r3 = create_recipe(user=self.user, title='Fish and Chips')
 
         params = {'tags': f'{tag1.id},{tag2.id}'}
@@ -448,9 +541,9 @@ class PrivateRecipeApiTests(TestCase):
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_ingredients(self):
         """Filter recipes by ingredients."""
@@ -458,8 +551,11 @@ class PrivateRecipeApiTests(TestCase):
         r2 = create_recipe(user=self.user, title='Aubergine with Tahini')
         ingredient1 = Ingredient.objects.create(user=self.user, name='Garlic')
         ingredient2 = Ingredient.objects.create(user=self.user, name='Ginger')
-        r1.ingredients.add(ingredient1)
-        r2.ingredients.add(ingredient2)
+        # One through-table INSERT for both assignments.
+        Recipe.ingredients.through.objects.bulk_create([
+            Recipe.ingredients.through(recipe=r1, ingredient=ingredient1),
+            Recipe.ingredients.through(recipe=r2, ingredient=ingredient2),
+        ])
         r3 = create_recipe(user=self.user, title='Fish and Chips')
 
         params = {'ingredients': f'{ingredient1.id},{ingredient2.id}'}
@@ -468,24 +564,38 @@ class PrivateRecipeApiTests(TestCase):
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
 
-class imageUploadTests(TestCase):
+class imageUploadTests(BaseAPITestCase):
     """Test for the image upload API."""
 
+    # Encode the sample JPEG once; each test wraps the bytes in a
+    # fresh upload object, keeping PIL out of the per-test hot path.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        buf = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(buf, format='JPEG')
+        cls._jpeg_bytes = buf.getvalue()
+
+    # setUpTestData creates the shared fixtures once per class; each
+    # test still sees a clean copy thanks to per-test rollback.
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'user@example.com',
+            'testpass123'
+        )
+        cls.recipe = create_recipe(user=cls.user)
+
     # setUp method is used to set up the test environment
     # It is called before each test method in the class.
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
-            'user@example.com',
-            'testpass123'
-        )
         self.client.force_authenticate(self.user)
-        self.recipe = create_recipe(user=self.user)
 
     # tearDown method is used to clean up after the test
     # It is called after each test method in the class.
@@ -497,25 +607,33 @@ class imageUploadTests(TestCase):
         """Test uploading an image to a recipe."""
         url = image_upload_url(self.recipe.id)
 
-        # This is going to create a temporary file with suffix .jpg
-        # The file is created temporarily and will be deleted automatically
-        # outside the with block
-        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
-            # Create a small image in memory
-            img = Image.new('RGB', (10, 10))
-            # Save the image to the temporary file
-            img.save(image_file, format='JPEG')
-            # Move the file pointer to the beginning of the file
-            image_file.seek(0)
-            # format multipart cause it has some texts and some binary data
-            res = self.client.post(
-                url, {'image': image_file}, format='multipart')
+        image_file = SimpleUploadedFile(
+            'recipe.jpg', self._jpeg_bytes, content_type='image/jpeg')
+        # format multipart cause it has some texts and some binary data
+        res = self.client.post(
+            url, {'image': image_file}, format='multipart')
 
         self.recipe.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('image', res.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    def test_upload_large_image_is_downscaled(self):
+        """Test an oversized upload is resized before storage."""
+        url = image_upload_url(self.recipe.id)
+        buf = io.BytesIO()
+        Image.new('RGB', (2048, 1536)).save(buf, format='JPEG')
+        image_file = SimpleUploadedFile(
+            'big.jpg', buf.getvalue(), content_type='image/jpeg')
+
+        res = self.client.post(
+            url, {'image': image_file}, format='multipart')
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        with Image.open(self.recipe.image.path) as stored:
+            self.assertLessEqual(max(stored.size), 1024)
+
     def test_upload_image_bad_request(self):
         """Test uploading an invalid image."""
         url = image_upload_url(self.recipe.id)
@@ -2,10 +2,11 @@
 Test tags api.
 """
 from decimal import Decimal
+from functools import lru_cache
 
-from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from core.tests.base import BaseAPITestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -13,9 +14,13 @@ from core.models import Tag, Recipe
 
 from recipe.serializers import TagSerializer
 
+# Resolve the user model once per module import, not per call.
+User = get_user_model()
+
 TAGS_URL = reverse('recipe:tag-list')
 
 
+@lru_cache(maxsize=None)
 def detail_url(tag_id):
     """Create and return a tag detail url."""
     return reverse('recipe:tag-detail', args=[tag_id])
@@ -23,10 +28,10 @@ def detail_url(tag_id):
 
 def create_user(email='user@example.com', password='testpass123'):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(email=email, password=password)
+    return User.objects.create_user(email=email, password=password)
 
 
-class PublicTagsApiTests(TestCase):
+class PublicTagsApiTests(BaseAPITestCase):
     """Test the publically available tags API."""
 
     def setUp(self):
@@ -38,14 +43,28 @@ class PublicTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateTagsApiTests(TestCase):
+class PrivateTagsApiTests(BaseAPITestCase):
     """Test the private tags API."""
 
+    @classmethod
+    def setUpTestData(cls):
+        # Hash the password once per class instead of once per test.
+        cls.user = create_user()
+
     def setUp(self):
         self.client = APIClient()
-        self.user = create_user()
         self.client.force_authenticate(self.user)
 
+    def test_retrieve_tags_query_count(self):
+        """Test the tag list issues one query regardless of tag count."""
+        for i in range(5):
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 5)
+
     def test_retrieve_tags(self):
         """Test retrieving tags."""
         Tag.objects.create(user=self.user, name='Dessert')
@@ -115,6 +134,12 @@ class PrivateTagsApiTests(TestCase):
         self.assertIn(serializer1.data, res.data)
         self.assertNotIn(serializer2.data, res.data)
 
+    def test_filter_assigned_malformed_returns_400(self):
+        """Test a non-numeric assigned_only flag is rejected, not a 500."""
+        res = self.client.get(TAGS_URL, {'assigned_only': 'true'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_filter_tags_assigned_unique(self):
         """Test filtering tags assigned returns unique items."""
         tag = Tag.objects.create(user=self.user, name='Breakfast')
@@ -1,13 +1,22 @@
 """
 Views for the recipe app.
 """
+import re
+from decimal import Decimal
+from hashlib import md5
+
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
     OpenApiTypes,)
+from django.core.cache import cache
+from django.db.models import Count, Exists, Max, OuterRef, Prefetch
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import (viewsets, mixins, status)
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
@@ -17,6 +26,15 @@ from recipe.serializers import (RecipeSerializer,
                                 TagSerializer,
                                 IngredientSerializer)
 from core.models import (Recipe, Tag, Ingredient)
+from recipe.pagination import RecipeCursorPagination
+from recipe.caching import (LIST_CACHE_TTL,
+                            attr_list_cache_key,
+                            recipe_list_cache_key,
+                            recipe_list_version)
+
+# Compiled once at import; validates a comma separated id list in a
+# single pass instead of try/excepting around each int() call.
+ID_LIST_RE = re.compile(r'^\d+(?:,\d+)*$')
 
 
 @extend_schema_view(
@@ -41,10 +59,28 @@ class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+
+    def initial(self, request, *args, **kwargs):
+        """Run DRF's checks, then pin the authenticated user locally.
+
+        Every handler below needs the user; one attribute read beats
+        repeating the request.user property lookup chain.
+        """
+        super().initial(request, *args, **kwargs)
+        self._user = request.user
 
     def _params_to_ints(self, qs):
-        """Convert a list of strings to integers."""
-        return [int(str_id) for str_id in qs.split(',')]
+        """Convert a comma separated id list to integers.
+
+        Malformed input used to escape as a ValueError (a 500);
+        validating up front turns it into a clean 400.
+        """
+        if not ID_LIST_RE.match(qs):
+            raise ValidationError(
+                {'detail': 'Filter ids must be comma separated integers.'}
+            )
+        return list(map(int, qs.split(',')))
 
     def get_queryset(self):
         """Return recipes for the authenticated user."""
@@ -52,16 +88,134 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ingredients = self.request.query_params.get('ingredients')
         # adding in a local variable to apply the filters
         queryset = self.queryset
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+        if tags or ingredients:
+            # Filter through an id subquery instead of joining the M2M
+            # tables onto the outer query: the joins fan out to one row
+            # per match and need a DISTINCT to dedupe, while IN dedupes
+            # for free and keeps the outer plan a plain pk lookup.
+            matching = self.queryset
+            if tags:
+                matching = matching.filter(
+                    tags__id__in=self._params_to_ints(tags)
+                )
+            if ingredients:
+                matching = matching.filter(
+                    ingredients__id__in=self._params_to_ints(ingredients)
+                )
+            queryset = queryset.filter(id__in=matching.values('id'))
 
         # Very important to return queryset not self.queryset
-        return queryset.filter(
-            user=self.request.user).distinct().order_by('-id')
+        # (getattr: schema generation calls this outside a dispatch,
+        # before initial() has pinned the user).
+        queryset = queryset.filter(
+            user=getattr(self, '_user', None) or self.request.user
+        ).select_related('user').order_by('-id')
+        # Only the read actions dereference the M2M relations, so the
+        # create/update/delete paths skip the two prefetch queries.
+        # Prefetch with trimmed querysets: only id/name are rendered.
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+                Prefetch(
+                    'ingredients',
+                    queryset=Ingredient.objects.only('id', 'name'),
+                ),
+            )
+        return queryset
+
+    def _related_name_map(self, field, recipe_ids):
+        """Map recipe id -> [{'id': ..., 'name': ...}] for one M2M."""
+        through = getattr(Recipe, field).field.remote_field.through
+        related = {}
+        rows = through.objects.filter(recipe_id__in=recipe_ids).values_list(
+            'recipe_id', f'{field[:-1]}__id', f'{field[:-1]}__name',
+        )
+        for recipe_id, rel_id, rel_name in rows:
+            related.setdefault(recipe_id, []).append(
+                {'id': rel_id, 'name': rel_name}
+            )
+        return related
+
+    def _build_list_data(self, request):
+        """Build the list payload straight from values() rows.
+
+        The list payload is flat apart from the tag/ingredient names,
+        so model hydration and the serializer add nothing but CPU.
+        Two through-table queries replace the two prefetches, keeping
+        the query count identical. The cursor paginator slices the
+        values() queryset before any row is materialised.
+        """
+        fields = request.query_params.get('fields')
+        allowed = set(fields.split(',')) if fields else None
+        queryset = self.get_queryset().prefetch_related(None)
+        rows = queryset.values(
+            'id', 'title', 'time_minutes', 'price_cents', 'link',
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            rows = page
+        data = []
+        recipe_ids = []
+        for row in rows:
+            recipe_ids.append(row['id'])
+            price = Decimal(row['price_cents']) / 100
+            item = {
+                'id': row['id'],
+                'title': row['title'],
+                'time_minutes': row['time_minutes'],
+                'price': str(price.quantize(Decimal('0.01'))),
+                'link': row['link'],
+            }
+            if allowed is not None:
+                item = {k: v for k, v in item.items() if k in allowed}
+            data.append(item)
+        for field in ('tags', 'ingredients'):
+            if allowed is not None and field not in allowed:
+                continue
+            related = self._related_name_map(field, recipe_ids)
+            for recipe_id, item in zip(recipe_ids, data):
+                item[field] = related.get(recipe_id, [])
+        if page is not None:
+            return self.get_paginated_response(data).data
+        return data
+
+    def list(self, request, *args, **kwargs):
+        """List recipes, answering 304 for clients with a fresh copy."""
+        stats = self.get_queryset().aggregate(
+            count=Count('id'),
+            modified=Max('date_modified'),
+        )
+        # The payload embeds tag/ingredient names, and renaming one
+        # touches no Recipe row; the signal-bumped version counter
+        # covers those changes, so it belongs in the ETag too.
+        # Hashed because RFC 7232 forbids spaces in entity-tags and
+        # str(Max('date_modified')) contains them.
+        version = recipe_list_version(self._user.id)
+        etag = quote_etag(md5(
+            f"{stats['count']}-{stats['modified']}-{version}".encode()
+        ).hexdigest())
+        # Cheap aggregate first; the full query + projection run only
+        # when the client's cached copy is out of date.
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            # Server-side cache behind the ETag check, keyed by user,
+            # query params and a version the signal handlers bump.
+            key = recipe_list_cache_key(self._user.id,
+                                        request.query_params)
+            data = cache.get(key)
+            if data is None:
+                data = self._build_list_data(request)
+                cache.set(key, data, LIST_CACHE_TTL)
+            response = Response(data)
+            response['ETag'] = etag
+        return response
+
+    def get_serializer(self, *args, **kwargs):
+        """Honour ?fields=id,title sparse-fieldset requests."""
+        fields = self.request.query_params.get('fields')
+        if fields and self.action in ('list', 'retrieve'):
+            kwargs['fields'] = fields.split(',')
+        return super().get_serializer(*args, **kwargs)
 
     def get_serializer_class(self):
         """Return appropriate serializer class based on action."""
@@ -73,7 +227,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create a new recipe."""
-        serializer.save(user=self.request.user)
+        serializer.save(user=self._user)
     """
     The @action decorator is used to create custom actions in viewsets.
     By default, it creates a GET endpoint, but you can specify
@@ -88,7 +242,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         recipe = self.get_object()
         serializer = self.get_serializer(recipe, data=request.data)
         if serializer.is_valid():
-            serializer.save(user=self.request.user)
+            serializer.save(user=self._user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -118,27 +272,99 @@ class BaseRecipeAttrViewSet(mixins.UpdateModelMixin,
     """Base viewset for recipe attributes."""
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    # The recipe M2M field pointing at this attr; set by subclasses.
+    assigned_filter = None
+
+    def initial(self, request, *args, **kwargs):
+        """Run DRF's checks, then pin the authenticated user locally."""
+        super().initial(request, *args, **kwargs)
+        self._user = request.user
+
+    def _assigned_only(self):
+        """Parse and validate the assigned_only flag once per request.
+
+        Garbage like ?assigned_only=true used to escape as a
+        ValueError (a 500); it now gets a clean 400, matching the
+        recipe filter param handling.
+        """
+        flag = getattr(self, '_assigned_only_flag', None)
+        if flag is None:
+            value = self.request.query_params.get('assigned_only', '0')
+            if value not in ('0', '1'):
+                raise ValidationError(
+                    {'assigned_only': 'Must be 0 or 1.'}
+                )
+            flag = self._assigned_only_flag = value == '1'
+        return flag
 
     def get_queryset(self):
         """Return objects for the authenticated user."""
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
-        )
+        assigned_only = self._assigned_only()
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            # A correlated EXISTS stops at the first matching recipe;
+            # the old recipe__isnull=False join emitted one row per
+            # assignment and needed a DISTINCT to dedupe them.
+            queryset = queryset.annotate(
+                assigned=Exists(
+                    Recipe.objects.filter(
+                        **{self.assigned_filter: OuterRef('pk')}
+                    )
+                )
+            ).filter(assigned=True)
         return queryset.filter(
-            user=self.request.user
-            ).distinct().order_by('-name')
+            user=getattr(self, '_user', None) or self.request.user
+            ).order_by('-name')
+
+    def _build_list_response(self, request, *args, **kwargs):
+        """Produce the uncached list response; subclasses may override."""
+        return super().list(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        """List attrs, serving repeat reads from the cache.
+
+        Entries are invalidated by the signal handlers in
+        recipe/signals.py whenever the underlying rows change.
+        """
+        assigned_only = self._assigned_only()
+        key = attr_list_cache_key(
+            self.queryset.model._meta.model_name,
+            self._user.id,
+            assigned_only,
+        )
+        data = cache.get(key)
+        if data is None:
+            response = self._build_list_response(request, *args, **kwargs)
+            cache.set(key, response.data, LIST_CACHE_TTL)
+            return response
+        return Response(data)
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in the database."""
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
+    assigned_filter = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients in the database."""
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
+    assigned_filter = 'ingredients'
+
+    def get_queryset(self):
+        """Fetch only the columns the serializer exposes.
+
+        The user FK id stays loaded: the cache-invalidation signals
+        read it, and deferring it would cost a reload on delete.
+        """
+        return super().get_queryset().only('id', 'name', 'user')
+
+    def _build_list_response(self, request, *args, **kwargs):
+        """Return a plain values() projection.
+
+        Skips model hydration and serializer allocation; the output
+        shape matches IngredientSerializer exactly.
+        """
+        return Response(list(self.get_queryset().values('id', 'name')))
@@ -5,30 +5,43 @@ Serializers for the User API View.
 from django.contrib.auth import (get_user_model, authenticate)
 from rest_framework import serializers
 
+from core.mixins import CachedFieldsMixin
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
     class Meta:
         model = get_user_model()
         fields = ('email', 'name', 'password')
         extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
 
+    def to_representation(self, instance):
+        """Return a plain dict; it renders faster than an OrderedDict."""
+        return dict(super().to_representation(instance))
+
     def create(self, validated_data):
         """Create and return a user with encrypted password."""
         return get_user_model().objects.create_user(**validated_data)
 
     def update(self, instance, validated_data):
-        """Update and return a user."""
-        password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        """Update and return a user.
 
+        One UPDATE limited to the touched columns; the old
+        super().update() + save() pair wrote the row twice when a
+        password was supplied.
+        """
+        password = validated_data.pop('password', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        update_fields = list(validated_data)
         if password:
-            """We are setting the password in different
-            way to ensure it is hashed."""
-            user.set_password(password)
-            user.save()
+            # set_password hashes; assigning directly would store
+            # the plain text.
+            instance.set_password(password)
+            update_fields.append('password')
+        instance.save(update_fields=update_fields or None)
 
-        return user
+        return instance
 
 
 class AuthTokenSerializer(serializers.Serializer):
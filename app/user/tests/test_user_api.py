@@ -8,6 +8,8 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+# Resolve the user model once per module import, not per call.
+User = get_user_model()
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
@@ -16,7 +18,7 @@ ME_URL = reverse('user:me')
 
 def create_user(**params):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
+    return User.objects.create_user(**params)
 
 # Public tests = Unauthenticated requests Example: Creating a user
 
@@ -38,7 +40,7 @@ class PublicUserApiTests(TestCase):
         }
         res = self.client.post(CREATE_USER_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        user = get_user_model().objects.get(email=payload['email'])
+        user = User.objects.get(email=payload['email'])
         self.assertTrue(user.check_password(payload['password']))
         self.assertNotIn('password', res.data)
 
@@ -62,7 +64,7 @@ class PublicUserApiTests(TestCase):
         }
         res = self.client.post(CREATE_USER_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
-        user_exists = get_user_model().objects.filter(
+        user_exists = User.objects.filter(
             email=payload['email']
         ).exists()
         self.assertFalse(user_exists)
@@ -117,12 +119,17 @@ class PublicUserApiTests(TestCase):
 
 class PrivateUserApiTests(TestCase):
     """Test API requests that require authentication."""
-    def setUp(self):
-        self.user = create_user(
+
+    @classmethod
+    def setUpTestData(cls):
+        # Hash the password once per class instead of once per test.
+        cls.user = create_user(
             email='test@example.com',
             password='testpass',
             name='Test User'
         )
+
+    def setUp(self):
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
@@ -4,6 +4,7 @@ Views for USER API
 
 from rest_framework import generics, authentication, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.throttling import ScopedRateThrottle
 from user.serializers import (UserSerializer, AuthTokenSerializer)
 from rest_framework.settings import api_settings
 
@@ -18,9 +19,14 @@ class CreateUserView(generics.CreateAPIView):
 class CreateTokenView(ObtainAuthToken):
     """
     Create a new auth token for user.
+
+    Throttled: every attempt costs a deliberately slow password hash,
+    so unthrottled login spam doubles as a CPU-exhaustion vector.
     """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = 'login'
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):